@@ -1,53 +1,75 @@
 import os
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
+# Load environment variables from .env file; extraction workers get resolved values as
+# arguments, so only the main process needs these settings
 load_dotenv()
 
 # OpenAI API Configuration
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')  # Default to gpt-4o-mini
 OPENAI_MAX_TOKENS = int(os.getenv('OPENAI_MAX_TOKENS', '2000'))
+OPENAI_MAX_OUTPUT_TOKENS = int(os.getenv('OPENAI_MAX_OUTPUT_TOKENS', '16384'))  # Model's output token limit (16384 for gpt-4o and gpt-4o-mini)
 OPENAI_TEMPERATURE = float(os.getenv('OPENAI_TEMPERATURE', '0.0'))
+# Ask for JSON matching the CSV schema (structured outputs); disable for models without support, e.g. gpt-3.5-turbo
+OPENAI_STRUCTURED_OUTPUT = os.getenv('OPENAI_STRUCTURED_OUTPUT', 'true').lower() == 'true'
+
+# Request Dispatch Configuration
+# 'async' sends concurrent requests (results in minutes), 'batch' uses the Batch API (50% cheaper, up to 24h)
+PROCESSING_MODE = os.getenv('PROCESSING_MODE', 'async')
+OPENAI_MAX_CONCURRENT_REQUESTS = int(os.getenv('OPENAI_MAX_CONCURRENT_REQUESTS', '10'))
+OPENAI_TOKENS_PER_MINUTE = int(os.getenv('OPENAI_TOKENS_PER_MINUTE', '200000'))  # Match your account's TPM limit
+OPENAI_REQUESTS_PER_MINUTE = int(os.getenv('OPENAI_REQUESTS_PER_MINUTE', '500'))  # Match your account's RPM limit
+OPENAI_MAX_RETRIES = 6  # Attempts per request on rate limit / transient API errors
+# Pack up to this many short papers into one request (JSON output) to avoid resending the prompt; 1 disables packing
+MAX_PAPERS_PER_REQUEST = int(os.getenv('MAX_PAPERS_PER_REQUEST', '1'))
+
+# OpenAI Batch API Configuration (used when PROCESSING_MODE is 'batch')
+BATCH_COMPLETION_WINDOW = '24h'  # Only window currently supported by the Batch API
+BATCH_POLL_INITIAL_DELAY = 10  # Seconds before the first status check
+BATCH_POLL_MAX_DELAY = 300  # Upper bound for the exponential polling backoff
 
 # File Paths
 PDF_FOLDER = 'pdfs'
 OUTPUT_FOLDER = 'output'
 PROMPT_FILE = 'prompt_template.txt'
+TEXT_CACHE_FOLDER = '.cache'  # Extracted PDF text, keyed by file content hash
+RESPONSE_CACHE_FOLDER = os.path.join(TEXT_CACHE_FOLDER, 'responses')  # OpenAI responses, keyed by request hash
 
-# CSV Column Headers (based on your coding schema with source evidence)
-# Total: 27 columns (Title + Include/Exclude + Exclusion Reason + 12 questions + 12 source evidence columns)
-CSV_COLUMNS = [
-    'Title',
-    'Include in Review (Y/N)',
-    'Exclusion Reason',
+# Coding questions in prompt order: question N of the prompt is BASE_QUESTIONS[N - 1]
+BASE_QUESTIONS = [
     '1.1 Primary Stakeholders',
-    '1.1 Primary Stakeholders - Source',
     '1.2 Context',
-    '1.2 Context - Source', 
     '1.3 Tech/AI type',
-    '1.3 Tech/AI type - Source',
     '1.4 Tool/Platform',
-    '1.4 Tool/Platform - Source',
     '1.5 Education level',
-    '1.5 Education level - Source',
     '2.1 Feedback term',
-    '2.1 Feedback term - Source',
     '2.2 Description of context',
-    '2.2 Description of context - Source',
     '2.3 Our evaluation',
-    '2.3 Our evaluation - Source',
     '3.1 Agency type',
-    '3.1 Agency type - Source',
     '3.2 Feedback timing control',
-    '3.2 Feedback timing control - Source',
     '4.1 Metrics for evaluation',
-    '4.1 Metrics for evaluation - Source',
-    '4.2 Measurement of agency',
-    '4.2 Measurement of agency - Source'
+    '4.2 Measurement of agency'
+]
+
+# Evidence column for each question
+SOURCE_COLUMNS = {question: f'{question} - Source' for question in BASE_QUESTIONS}
+
+# CSV Column Headers (based on your coding schema with source evidence)
+# Total: 27 columns (Title + Include/Exclude + Exclusion Reason + 12 questions + 12 source evidence columns)
+CSV_COLUMNS = ['Title', 'Include in Review (Y/N)', 'Exclusion Reason'] + [
+    column for question in BASE_QUESTIONS for column in (question, SOURCE_COLUMNS[question])
 ]
 
+# Answer and source columns, i.e. every column after Title, Include in Review (Y/N) and Exclusion Reason
+ANSWER_COLUMNS = CSV_COLUMNS[3:]
+
 # Processing Configuration
 MAX_TEXT_LENGTH = 200000  # Increased limit - most papers will fit
 CHUNK_SIZE = 100000  # Larger chunks for better context
-MAX_CONTEXT_TOKENS = 120000  # Conservative token limit for gpt-4o-mini (128k context)
\ No newline at end of file
+MAX_CONTEXT_TOKENS = 120000  # Conservative token limit for gpt-4o-mini (128k context)
+MAX_EXTRACTED_CHARS = MAX_CONTEXT_TOKENS * 4  # Stop reading pages once the model's context could be filled
+MIN_TEXT_CHARS = 1000  # Shorter extractions are not sent to OpenAI (e.g. scanned PDFs without OCR)
+MIN_ALPHA_RATIO = 0.5  # Minimum share of letters in extracted text; lower means garbled extraction
+# Parallel PDF text extraction processes; parsing stops scaling at around 6, so more cores are left to the OS by default
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', min(os.cpu_count() or 1, 6)))
\ No newline at end of file
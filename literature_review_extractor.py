@@ -8,17 +8,30 @@ It reads PDFs from a specified folder, extracts text, sends it to OpenAI for ana
 and saves the results in a CSV file.
 """
 
+import argparse
+import asyncio
+import csv
+import hashlib
+import importlib.util
+import io
+import json
 import logging
+import os
+import re
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import TYPE_CHECKING, IO, Iterator, List, Dict, Optional, Tuple
 
-import pandas as pd
-import pdfplumber
-from openai import OpenAI
+# pdfplumber and openai are imported where they are used: together they
+# take most of a second to import and are not needed for --help or text-only paths
+from aiolimiter import AsyncLimiter
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
 from tqdm import tqdm
 import unicodedata
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
 import tempfile
 import fitz
 import pypdf as PyPDF  # Modern replacement for PyPDF2
@@ -27,141 +40,343 @@ import pypdf as PyPDF  # Modern replacement for PyPDF2
 try:
     import pytesseract
     from PIL import Image
-    import io
     # Set the tesseract command path for Windows
     pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
     OCR_AVAILABLE = True
 except ImportError:
     OCR_AVAILABLE = False
 
+# Exact token counts for the configured model; without tiktoken we fall back to ~4 characters per token
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# HTTP/2 lets concurrent requests share one connection; httpx only supports it when h2 is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
 from config import (
-    OPENAI_API_KEY, OPENAI_MODEL, OPENAI_MAX_TOKENS, OPENAI_TEMPERATURE,
-    PDF_FOLDER, OUTPUT_FOLDER, PROMPT_FILE, CSV_COLUMNS, MAX_CONTEXT_TOKENS
+    OPENAI_API_KEY, OPENAI_MODEL, OPENAI_MAX_TOKENS, OPENAI_MAX_OUTPUT_TOKENS, OPENAI_TEMPERATURE, OPENAI_STRUCTURED_OUTPUT,
+    PDF_FOLDER, OUTPUT_FOLDER, PROMPT_FILE, TEXT_CACHE_FOLDER, RESPONSE_CACHE_FOLDER, BASE_QUESTIONS, SOURCE_COLUMNS, CSV_COLUMNS, ANSWER_COLUMNS, MAX_CONTEXT_TOKENS, MAX_EXTRACTED_CHARS,
+    MIN_TEXT_CHARS, MIN_ALPHA_RATIO, EXTRACTION_WORKERS, PROCESSING_MODE, OPENAI_MAX_CONCURRENT_REQUESTS, MAX_PAPERS_PER_REQUEST, OPENAI_TOKENS_PER_MINUTE,
+    OPENAI_REQUESTS_PER_MINUTE, OPENAI_MAX_RETRIES, BATCH_COMPLETION_WINDOW, BATCH_POLL_INITIAL_DELAY, BATCH_POLL_MAX_DELAY
 )
 
+# Question numbers used in the model response, mapped to their CSV column (without " - Source" suffix)
+QUESTION_COLUMNS = {str(number): question for number, question in enumerate(BASE_QUESTIONS, 1)}
 
-class LiteratureReviewExtractor:
-    """Main class for extracting coding information from research papers."""
-    
-    def __init__(self):
-        """Initialize the extractor with OpenAI client and logging."""
-        self.setup_logging()
-        self.client = self._initialize_openai_client()
-        self.prompt_template = self._load_prompt_template()
-        
-    def setup_logging(self):
-        """Setup logging configuration."""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('literature_extraction.log'),
-                logging.StreamHandler()
-            ]
-        )
-        self.logger = logging.getLogger(__name__)
+# Question codes ("1.1", "1.2", ...) used as keys of the "fields" object in JSON mode responses
+FIELD_COLUMNS = {question.split(' ', 1)[0]: question for question in BASE_QUESTIONS}
+
+# The prompt only numbers its questions 1-12, so JSON output instructions spell out which
+# key belongs to which question, e.g. '"2.1" = question 6 (Feedback term)'
+FIELD_CODE_GUIDE = "; ".join(
+    f'"{code}" = question {number} ({question.split(" ", 1)[1]})'
+    for number, (code, question) in enumerate(FIELD_COLUMNS.items(), 1)
+)
+COLUMN_KEY_GUIDE = "; ".join(
+    f'question {number} -> "{question}"' for number, question in enumerate(BASE_QUESTIONS, 1)
+)
+
+# Numbered question prefix, either "**X." or "X."
+QUESTION_PREFIX_RE = re.compile(r'^(\*\*)?(\d{1,2})\.')
+
+# Lowercased answers starting with a question word are echoed questions, not answers
+QUESTION_STARTER_RE = re.compile(r'(?:what|how|who|when|where|why|does|do|is|are|can|will|should) ')
+
+# Row templates, copied for each paper instead of being rebuilt column by column
+DEFAULT_ROW = dict.fromkeys(CSV_COLUMNS, "Not specified")
+# Default to exclude if processing failed
+FAILED_ROW = {**dict.fromkeys(CSV_COLUMNS, "Processing failed"), 'Include in Review (Y/N)': "N"}
+
+# Minor words kept lowercase in titles built from filenames, unless they start the title
+TITLE_LOWERCASE_WORDS = frozenset({
+    'a', 'an', 'and', 'as', 'at', 'but', 'by', 'for', 'if', 'in', 'of', 'on', 'or', 'the', 'to', 'up', 'via', 'with'
+})
+
+# Section header keywords, in the order they are tried when a header line contains several
+SECTION_MARKERS = ('abstract', 'introduction', 'method', 'result', 'discussion', 'conclusion', 'reference')
+SECTION_MARKER_RE = re.compile('|'.join(SECTION_MARKERS))
+
+# Markup tags in PyMuPDF's HTML page output
+HTML_TAG_RE = re.compile('<[^<]+?>')
+
+# JSON schema for structured outputs: one required string per CSV column except Title
+CODING_RESULT_SCHEMA = {
+    "type": "object",
+    "properties": {col: {"type": "string"} for col in CSV_COLUMNS if col != 'Title'},
+    "required": [col for col in CSV_COLUMNS if col != 'Title'],
+    "additionalProperties": False
+}
+
+# Structured output for grouped requests: one coding result per paper, tagged with its 1-based index
+GROUP_CODING_RESULT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"paper_index": {"type": "integer"}, **CODING_RESULT_SCHEMA["properties"]},
+                "required": ["paper_index"] + CODING_RESULT_SCHEMA["required"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["results"],
+    "additionalProperties": False
+}
+
+
+def _question_column(line: str) -> Tuple[Optional[str], bool]:
+    """Return the CSV column for a numbered question line and whether its number is bold."""
+    match = QUESTION_PREFIX_RE.match(line)
+    if not match:
+        return None, False
+    return QUESTION_COLUMNS.get(match.group(2)), match.group(1) is not None
+
+
+def _flatten_json_fields(entry: Dict) -> Dict:
+    """Convert a JSON mode answer with nested "fields" to the column-keyed form of structured outputs."""
+    flat = {
+        'Include in Review (Y/N)': entry.get("include"),
+        'Exclusion Reason': entry.get("exclusion_reason")
+    }
+    for code, field in entry["fields"].items():
+        column = FIELD_COLUMNS.get(code)
+        if column is not None and isinstance(field, dict):
+            flat[column] = field.get("value")
+            flat[SOURCE_COLUMNS[column]] = field.get("source")
+    return flat
+
+
+@lru_cache(maxsize=4096)
+def _title_from_filename(filename: str) -> str:
+    """Format a PDF filename as a title; cached since resumed runs format each filename twice."""
+    # Replace common separators with spaces; split() also collapses repeated spaces
+    words = Path(filename).stem.replace('_', ' ').replace('-', ' ').split()
     
-    def _initialize_openai_client(self) -> OpenAI:
-        """Initialize OpenAI client with API key validation."""
-        if not OPENAI_API_KEY:
-            raise ValueError(
-                "OpenAI API key not found. Please set OPENAI_API_KEY in your .env file"
-            )
-        
+    # Title case, keeping minor words lowercase unless they start the title
+    return ' '.join(
+        word.lower() if i and word.lower() in TITLE_LOWERCASE_WORDS else word.capitalize()
+        for i, word in enumerate(words)
+    )
+
+
+def find_pdf_files(folder) -> List[str]:
+    """Return the paths of PDF files in folder, with any capitalization of the extension."""
+    # scandir reads names and file types from the directory listing, without a stat() call per entry
+    with os.scandir(folder) as entries:
+        return [entry.path for entry in entries
+                if entry.name.lower().endswith('.pdf') and entry.is_file()]
+
+
+def _is_retryable_error(error: BaseException) -> bool:
+    """Check whether an OpenAI error is transient (rate limit, connection or server error)."""
+    from openai import APIConnectionError, InternalServerError, RateLimitError
+    return isinstance(error, (RateLimitError, APIConnectionError, InternalServerError))
+
+
+def _raise_if_auth_error(error: BaseException) -> None:
+    """Turn an OpenAI authentication failure into a ValueError, like the one raised for a missing key."""
+    from openai import AuthenticationError
+    if isinstance(error, AuthenticationError):
+        raise ValueError(
+            "OpenAI API key was rejected. Please set a valid OPENAI_API_KEY in your .env file"
+        ) from error
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Return the tiktoken encoding for OPENAI_MODEL, or None if it cannot be loaded."""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
         try:
-            client = OpenAI(api_key=OPENAI_API_KEY)
-            # Test the connection
-            client.models.list()
-            self.logger.info("OpenAI client initialized successfully")
-            return client
-        except Exception as e:
-            self.logger.error(f"Failed to initialize OpenAI client: {e}")
-            raise
+            return tiktoken.encoding_for_model(OPENAI_MODEL)
+        except KeyError:
+            # Model unknown to this tiktoken release; current OpenAI models use o200k_base
+            return tiktoken.get_encoding('o200k_base')
+    except Exception as e:
+        # Encoding files are downloaded on first use, which fails on offline machines
+        logging.getLogger(__name__).warning(f"tiktoken encoding unavailable, estimating tokens from length: {e}")
+        return None
+
+
+def _count_tokens(text: str) -> int:
+    """Count the tokens in text for the configured model."""
+    encoding = _get_encoding()
+    if encoding is None:
+        # Rough estimation: 1 token ≈ 4 characters
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Return the longest prefix of text that fits in max_tokens tokens."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def _normalize_text(text: str) -> str:
+    """Drop characters that cannot be encoded as UTF-8 (lone surrogates) and NFKC-normalize extracted text."""
+    if not text.isascii():
+        text = text.encode('utf-8', errors='ignore').decode('utf-8')
+        text = unicodedata.normalize('NFKC', text)
+    return text
+
+
+def _open_pdf_document(pdf_path: str, pdf_bytes: Optional[bytes] = None) -> "fitz.Document":
+    """Open a PDF with PyMuPDF, from its contents when they are already in memory."""
+    if pdf_bytes is not None:
+        return fitz.open(stream=pdf_bytes, filetype="pdf")
+    return fitz.open(pdf_path)
+
+
+def _write_cache_file(cache_path: Path, text: str) -> None:
+    """Write a cache file atomically, so an interrupted run never leaves a truncated entry behind."""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique per process, since extraction workers may write the same entry concurrently
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_text(text, encoding='utf-8')
+        os.replace(tmp_path, cache_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _results_path(filename: Optional[str] = None) -> Path:
+    """Return the path of a results CSV in the output folder, timestamped when no filename is given."""
+    output_dir = Path(OUTPUT_FOLDER)
+    output_dir.mkdir(exist_ok=True)
+    if not filename:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"literature_coding_results_{timestamp}.csv"
+    return output_dir / filename
+
+
+@contextmanager
+def _open_results_writer(output_path: Path) -> Iterator[Tuple[IO[str], csv.DictWriter]]:
+    """Open a results CSV for writing and write its header.
     
-    def _load_prompt_template(self) -> str:
-        """Load the prompt template from file."""
+    Saved with UTF-8 encoding and BOM for Excel compatibility; characters that cannot be
+    encoded (e.g. lone surrogates) are dropped, as are keys that are not in CSV_COLUMNS.
+    """
+    with open(output_path, 'w', newline='', encoding='utf-8-sig', errors='ignore') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        yield f, writer
+
+
+def _is_fallback_text(text: str) -> bool:
+    """Check whether extracted text is only the placeholder written when every method failed."""
+    return "text extraction failed with all available methods including ocr" in text.lower()
+
+
+def _is_low_quality_text(text: str) -> bool:
+    """Check whether extracted text is too short or too garbled to be worth an API call."""
+    if len(text) < MIN_TEXT_CHARS:
+        return True
+    sample = text[:5000]
+    return sum(c.isalpha() for c in sample) / len(sample) < MIN_ALPHA_RATIO
+
+
+class PDFTextExtractor:
+    """Extracts and caches the text of PDF files; holds no OpenAI state, so it is cheap to create in worker processes."""
+    
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        """Initialize with the given logger, or this module's logger in worker processes."""
+        self.logger = logger or logging.getLogger(__name__)
+    
+    def iter_pdf_pages(self, pdf_path: str, pdf_bytes: Optional[bytes] = None) -> Iterator[str]:
+        """Yield the raw text of each PDF page, keeping only one page in memory at a time."""
+        doc = _open_pdf_document(pdf_path, pdf_bytes)
         try:
-            with open(PROMPT_FILE, 'r', encoding='utf-8') as f:
-                template = f.read().strip()
-            self.logger.info(f"Loaded prompt template from {PROMPT_FILE}")
-            return template
-        except FileNotFoundError:
-            self.logger.error(f"Prompt template file {PROMPT_FILE} not found")
-            raise
-        except Exception as e:
-            self.logger.error(f"Error loading prompt template: {e}")
-            raise
+            for page in doc:
+                page_text = page.get_text()
+                if page_text:
+                    yield page_text
+        finally:
+            # Runs on exhaustion and when the consumer stops early
+            doc.close()
+    
+    def _text_cache_path(self, pdf_bytes: bytes, max_chars: Optional[int]) -> Path:
+        """Cache file for a PDF's extracted text, keyed by the SHA-256 of its contents."""
+        digest = hashlib.sha256(pdf_bytes).hexdigest()
+        suffix = f"_{max_chars}" if max_chars else ""
+        return Path(TEXT_CACHE_FOLDER) / f"{digest}{suffix}.txt"
     
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extract text from PDF with multiple fallback methods including OCR."""
+    def extract_text_from_pdf(self, pdf_path: str, max_chars: Optional[int] = None,
+                              use_cache: bool = True) -> str:
+        """Extract text from PDF, reusing cached text when the file is unchanged.
+        
+        Args:
+            pdf_path: Path to the PDF file.
+            max_chars: Stop reading further pages once this many characters have been
+                collected (primary method only). None reads the whole document.
+            use_cache: Read and write the on-disk text cache in TEXT_CACHE_FOLDER.
+        """
+        if not use_cache:
+            return _normalize_text(self._extract_text_uncached(pdf_path, max_chars))
+        
         filename = Path(pdf_path).name
+        # The bytes read for the cache key are parsed directly on a cache miss, so the file is read once
+        pdf_bytes = Path(pdf_path).read_bytes()
+        cache_path = self._text_cache_path(pdf_bytes, max_chars)
+        if cache_path.exists():
+            self.logger.info(f"Using cached text for {filename}")
+            return cache_path.read_text(encoding='utf-8')
         
-        # Method 1: Standard pdfplumber
-        try:
-            text = ""
-            with pdfplumber.open(pdf_path) as pdf:
-                # Check if PDF is encrypted
-                if hasattr(pdf, 'is_encrypted') and pdf.is_encrypted:
-                    self.logger.warning(f"PDF {filename} is encrypted, attempting to decrypt")
-                
-                for page_num, page in enumerate(pdf.pages):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            # Normalize Unicode characters
-                            page_text = unicodedata.normalize('NFKD', page_text)
-                            # Handle encoding issues
-                            page_text = page_text.encode('utf-8', errors='ignore').decode('utf-8')
-                            text += page_text + "\n"
-                    except Exception as e:
-                        self.logger.warning(f"Error extracting page {page_num + 1} from {filename}: {str(e)}")
-                        continue
-            
-            if text.strip():
-                self.logger.info(f"Method 1 (pdfplumber) succeeded: {len(text)} characters from {filename}")
-                return text.strip()
-        except Exception as e:
-            self.logger.warning(f"Method 1 (pdfplumber standard) failed for {filename}: {str(e)}")
+        text = _normalize_text(self._extract_text_uncached(pdf_path, max_chars, pdf_bytes))
         
-        # Method 2: pdfplumber with advanced tolerance settings
-        try:
-            text = ""
-            with pdfplumber.open(pdf_path) as pdf:
-                for page_num, page in enumerate(pdf.pages):
-                    try:
-                        # Try multiple extraction strategies
-                        strategies = [
-                            {'x_tolerance': 3, 'y_tolerance': 3},
-                            {'x_tolerance': 1, 'y_tolerance': 1},
-                            {'x_tolerance': 5, 'y_tolerance': 5}
-                        ]
-                        
-                        page_text = None
-                        for strategy in strategies:
-                            try:
-                                page_text = page.extract_text(**strategy)
-                                if page_text and len(page_text.strip()) > 50:  # Minimum meaningful content
-                                    break
-                            except Exception:
-                                continue
-                        
-                        if page_text:
-                            page_text = unicodedata.normalize('NFKD', page_text)
-                            page_text = page_text.encode('utf-8', errors='ignore').decode('utf-8')
-                            text += page_text + "\n"
-                    except Exception:
-                        continue
-            
-            if text.strip():
-                self.logger.info(f"Method 2 (pdfplumber advanced) succeeded: {len(text)} characters from {filename}")
-                return text.strip()
-        except Exception as e:
-            self.logger.warning(f"Method 2 (pdfplumber advanced) failed for {filename}: {str(e)}")
+        # Only cache real extractions so failed files are retried on the next run
+        if text and not _is_fallback_text(text):
+            try:
+                _write_cache_file(cache_path, text)
+            except OSError as e:
+                self.logger.warning(f"Could not write text cache for {filename}: {e}")
+        
+        return text
+    
+    def _extract_text_uncached(self, pdf_path: str, max_chars: Optional[int] = None,
+                               pdf_bytes: Optional[bytes] = None) -> str:
+        """Extract text from PDF with multiple fallback methods including OCR.
+        
+        Text is returned as the PDF library produced it; extract_text_from_pdf normalizes it once.
+        When pdf_bytes holds the file contents, the PyMuPDF and pdfplumber methods parse them
+        instead of reading the file again.
+        """
+        filename = Path(pdf_path).name
         
-        # Method 3: PyMuPDF with multiple extraction modes
+        # Method 1: PyMuPDF plain text (C extension, much faster than pdfminer-based pdfplumber)
         if fitz:
             try:
-                doc = fitz.open(pdf_path)
+                pages = []
+                char_count = 0
+                for page_text in self.iter_pdf_pages(pdf_path, pdf_bytes):
+                    pages.append(page_text)
+                    char_count += len(page_text) + 1
+                    if max_chars and char_count >= max_chars:
+                        self.logger.info(f"Reached {max_chars} character budget, skipping remaining pages of {filename}")
+                        break
+                text = "\n".join(pages)
+                
+                if text.strip():
+                    self.logger.info(f"Method 1 (PyMuPDF) succeeded: {len(text)} characters from {filename}")
+                    return text.strip()
+            except Exception as e:
+                self.logger.warning(f"Method 1 (PyMuPDF) failed for {filename}: {str(e)}")
+        
+        # Method 2: PyMuPDF with layout-based extraction modes (still far cheaper than pdfplumber)
+        if fitz:
+            try:
+                doc = _open_pdf_document(pdf_path, pdf_bytes)
                 text = ""
                 
                 for page_num, page in enumerate(doc):
@@ -169,8 +384,10 @@ class LiteratureReviewExtractor:
                         # Try different text extraction methods
                         page_text = None
                         
-                        # Standard text extraction
-                        page_text = page.get_text()
+                        # Text blocks in reading order (top to bottom, then left to right); plain
+                        # get_text() already ran in Method 1
+                        blocks = sorted(page.get_text("blocks"), key=lambda block: (block[1], block[0]))
+                        page_text = "\n".join(block[4] for block in blocks if block[6] == 0)
                         
                         # If that fails, try dictionary method
                         if not page_text or len(page_text.strip()) < 20:
@@ -191,13 +408,10 @@ class LiteratureReviewExtractor:
                             html_text = page.get_text("html")
                             if html_text:
                                 # Simple HTML tag removal
-                                import re
-                                page_text = re.sub('<[^<]+?>', '', html_text)
+                                page_text = HTML_TAG_RE.sub('', html_text)
                         
                         if page_text:
-                            page_text = unicodedata.normalize('NFKD', str(page_text))
-                            page_text = page_text.encode('utf-8', errors='ignore').decode('utf-8')
-                            text += page_text + "\n"
+                            text += str(page_text) + "\n"
                             
                     except Exception as e:
                         self.logger.warning(f"PyMuPDF error on page {page_num + 1} of {filename}: {str(e)}")
@@ -206,10 +420,47 @@ class LiteratureReviewExtractor:
                 doc.close()
                 
                 if text.strip():
-                    self.logger.info(f"Method 3 (PyMuPDF advanced) succeeded: {len(text)} characters from {filename}")
+                    self.logger.info(f"Method 2 (PyMuPDF advanced) succeeded: {len(text)} characters from {filename}")
                     return text.strip()
             except Exception as e:
-                self.logger.warning(f"Method 3 (PyMuPDF advanced) failed for {filename}: {str(e)}")
+                self.logger.warning(f"Method 2 (PyMuPDF advanced) failed for {filename}: {str(e)}")
+        
+        # Method 3: pdfplumber (fallback when PyMuPDF finds no text layer), opened once; pages
+        # without text under the default tolerances (3, 3) are retried with tighter and looser ones
+        try:
+            import pdfplumber
+            
+            text_parts = []
+            with pdfplumber.open(io.BytesIO(pdf_bytes) if pdf_bytes is not None else pdf_path) as pdf:
+                # Check if PDF is encrypted
+                if hasattr(pdf, 'is_encrypted') and pdf.is_encrypted:
+                    self.logger.warning(f"PDF {filename} is encrypted, attempting to decrypt")
+                
+                for page_num, page in enumerate(pdf.pages):
+                    try:
+                        page_text = page.extract_text()
+                    except Exception as e:
+                        self.logger.warning(f"Error extracting page {page_num + 1} from {filename}: {str(e)}")
+                        page_text = None
+                    
+                    if not page_text:
+                        for strategy in ({'x_tolerance': 1, 'y_tolerance': 1}, {'x_tolerance': 5, 'y_tolerance': 5}):
+                            try:
+                                page_text = page.extract_text(**strategy)
+                                if page_text and len(page_text.strip()) > 50:  # Minimum meaningful content
+                                    break
+                            except Exception:
+                                continue
+                    
+                    if page_text:
+                        text_parts.append(page_text + "\n")
+            
+            text = "".join(text_parts)
+            if text.strip():
+                self.logger.info(f"Method 3 (pdfplumber) succeeded: {len(text)} characters from {filename}")
+                return text.strip()
+        except Exception as e:
+            self.logger.warning(f"Method 3 (pdfplumber) failed for {filename}: {str(e)}")
         
         # Method 4: PyPDF (modern replacement for PyPDF2)
         if PyPDF:
@@ -229,8 +480,6 @@ class LiteratureReviewExtractor:
                         try:
                             page_text = page.extract_text()
                             if page_text:
-                                page_text = unicodedata.normalize('NFKD', page_text)
-                                page_text = page_text.encode('utf-8', errors='ignore').decode('utf-8')
                                 text += page_text + "\n"
                         except Exception as e:
                             self.logger.warning(f"PyPDF error on page {page_num + 1} of {filename}: {str(e)}")
@@ -254,7 +503,7 @@ class LiteratureReviewExtractor:
             )
             
             if result.returncode == 0 and result.stdout.strip():
-                text = unicodedata.normalize('NFKD', result.stdout)
+                text = result.stdout
                 self.logger.info(f"Method 5 (pdftotext) succeeded: {len(text)} characters from {filename}")
                 return text.strip()
         except (subprocess.TimeoutExpired, FileNotFoundError, Exception) as e:
@@ -282,8 +531,6 @@ class LiteratureReviewExtractor:
                         page_text = pytesseract.image_to_string(image, config=custom_config)
                         
                         if page_text and len(page_text.strip()) > 10:
-                            page_text = unicodedata.normalize('NFKD', page_text)
-                            page_text = page_text.encode('utf-8', errors='ignore').decode('utf-8')
                             text += page_text + "\n"
                             self.logger.info(f"OCR extracted {len(page_text)} characters from page {page_num + 1}")
                             
@@ -349,142 +596,336 @@ class LiteratureReviewExtractor:
             self.logger.error(f"Could not read file info for {filename}: {str(e)}")
         
         return ""
+
+
+class LiteratureReviewExtractor:
+    """Main class for extracting coding information from research papers."""
     
-    def get_paper_title(self, text: str, filename: str) -> str:
-        """Use filename as paper title with proper formatting."""
-        # Use filename without extension as title
-        title = Path(filename).stem
-        
-        # Clean up the filename to make it more readable
-        # Replace common separators with spaces
-        title = title.replace('_', ' ').replace('-', ' ')
-        
-        # Handle multiple spaces
-        title = ' '.join(title.split())
-        
-        # Ensure proper capitalization (title case)
-        # Keep certain words lowercase unless they start the title
-        lowercase_words = {'a', 'an', 'and', 'as', 'at', 'but', 'by', 'for', 'if', 'in', 'of', 'on', 'or', 'the', 'to', 'up', 'via', 'with'}
-        words = title.split()
-        
-        # Capitalize first word and words not in lowercase_words list
-        formatted_words = []
-        for i, word in enumerate(words):
-            if i == 0 or word.lower() not in lowercase_words:
-                formatted_words.append(word.capitalize())
-            else:
-                formatted_words.append(word.lower())
+    def __init__(self):
+        """Initialize the extractor with OpenAI client and logging."""
+        self.setup_logging()
+        self.client = self._initialize_openai_client()
+        self.prompt_template = self._load_prompt_template()
+        # Rate limiters belong to one event loop, so they are created by _rate_limiters in each run
+        self._limiters: Optional[Tuple[asyncio.AbstractEventLoop, AsyncLimiter, AsyncLimiter]] = None
+        
+    def setup_logging(self):
+        """Setup logging configuration."""
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s',
+            handlers=[
+                logging.FileHandler('literature_extraction.log'),
+                logging.StreamHandler()
+            ]
+        )
+        self.logger = logging.getLogger(__name__)
+    
+    def _initialize_openai_client(self) -> "AsyncOpenAI":
+        """Initialize OpenAI client, checking that an API key is configured."""
+        import httpx
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
         
-        formatted_title = ' '.join(formatted_words)
+        if not OPENAI_API_KEY:
+            raise ValueError(
+                "OpenAI API key not found. Please set OPENAI_API_KEY in your .env file"
+            )
         
+        # The key is not checked against the API here; an invalid key surfaces on the first request
+        try:
+            # One pooled connection per concurrent request, kept alive between papers
+            http_client = DefaultAsyncHttpxClient(http2=HTTP2_AVAILABLE, limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONCURRENT_REQUESTS,
+                max_keepalive_connections=OPENAI_MAX_CONCURRENT_REQUESTS
+            ))
+            # Retries are handled by tenacity in _create_completion
+            client = AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=0, http_client=http_client)
+            self.logger.info("OpenAI client initialized successfully")
+            return client
+        except Exception as e:
+            self.logger.error(f"Failed to initialize OpenAI client: {e}")
+            raise
+    
+    def _load_prompt_template(self) -> str:
+        """Load the prompt template from file."""
+        try:
+            with open(PROMPT_FILE, 'r', encoding='utf-8') as f:
+                template = f.read().strip()
+            self.logger.info(f"Loaded prompt template from {PROMPT_FILE}")
+            return template
+        except FileNotFoundError:
+            self.logger.error(f"Prompt template file {PROMPT_FILE} not found")
+            raise
+        except Exception as e:
+            self.logger.error(f"Error loading prompt template: {e}")
+            raise
+    
+    def get_paper_title(self, text: str, filename: str) -> str:
+        """Use filename as paper title with proper formatting."""
+        formatted_title = _title_from_filename(filename)
         self.logger.info(f"Using filename as title: {formatted_title}")
         return formatted_title
     
-    def _smart_text_processing(self, text: str) -> str:
-        """Process text intelligently to fit within token limits while preserving key information."""
-        # Rough estimation: 1 token ≈ 4 characters
-        estimated_tokens = len(text) // 4
-        
-        if estimated_tokens <= MAX_CONTEXT_TOKENS:
-            # Text fits comfortably, use as-is
-            return text
-        
-        self.logger.info(f"Large text detected (~{estimated_tokens} tokens). Using smart extraction.")
-        
-        # Split into sections and prioritize important parts
-        lines = text.split('\\n')
+    def _split_sections(self, text: str) -> List[Tuple[str, str]]:
+        """Split paper text into (section marker, content) pairs based on section header lines."""
+        lines = text.split('\n')
         sections = []
         current_section = []
-        section_markers = ['abstract', 'introduction', 'method', 'result', 'discussion', 'conclusion', 'reference']
         
         # Group lines into sections
         current_header = "start"
         for line in lines:
             line_lower = line.lower().strip()
             
-            # Check if this line is a section header
-            is_header = False
-            for marker in section_markers:
-                if marker in line_lower and len(line_lower) < 50:
-                    if current_section:
-                        sections.append((current_header, '\\n'.join(current_section)))
-                    current_section = [line]
-                    current_header = marker
-                    is_header = True
-                    break
-            
-            if not is_header:
+            # Check if this line is a section header: short lines only, all markers in one regex pass
+            if len(line_lower) < 50 and SECTION_MARKER_RE.search(line_lower):
+                if current_section:
+                    sections.append((current_header, '\n'.join(current_section)))
+                current_section = [line]
+                current_header = next(marker for marker in SECTION_MARKERS if marker in line_lower)
+            else:
                 current_section.append(line)
         
         # Don't forget the last section
         if current_section:
-            sections.append((current_header, '\\n'.join(current_section)))
+            sections.append((current_header, '\n'.join(current_section)))
+        
+        return sections
+    
+    def _smart_text_processing(self, text: str) -> str:
+        """Process text intelligently to fit within token limits while preserving key information."""
+        # A token covers at least one UTF-8 byte, so short texts fit without being tokenized
+        if len(text) <= MAX_CONTEXT_TOKENS and len(text.encode('utf-8')) <= MAX_CONTEXT_TOKENS:
+            return text
+        
+        estimated_tokens = _count_tokens(text)
+        
+        if estimated_tokens <= MAX_CONTEXT_TOKENS:
+            # Text fits comfortably, use as-is
+            return text
+        
+        self.logger.info(f"Large text detected ({estimated_tokens} tokens). Using smart extraction.")
+        
+        # Split into sections and bin their contents by header, keeping document order
+        sections_by_header: Dict[str, List[str]] = {}
+        for header, content in self._split_sections(text):
+            sections_by_header.setdefault(header, []).append(content)
         
         # Prioritize sections for extraction
         priority_order = ['abstract', 'introduction', 'method', 'result', 'discussion', 'start']
-        selected_text = ""
+        token_budget = int(MAX_CONTEXT_TOKENS * 0.8)  # Leave 20% buffer
+        selected_parts = []
+        selected_tokens = 0
         
         # Add sections in priority order until we approach token limit
         for priority in priority_order:
-            for header, content in sections:
-                if header == priority:
-                    potential_text = selected_text + "\\n\\n" + content
-                    if len(potential_text) // 4 < MAX_CONTEXT_TOKENS * 0.8:  # Leave 20% buffer
-                        selected_text = potential_text
-                    else:
-                        # If adding this section would exceed limit, add partial content
-                        remaining_chars = int((MAX_CONTEXT_TOKENS * 4 * 0.8) - len(selected_text))
-                        if remaining_chars > 1000:  # Only add if meaningful amount remains
-                            selected_text += "\\n\\n" + content[:remaining_chars] + "\\n[SECTION TRUNCATED]"
-                        self.logger.info(f"Reached token limit. Using {len(selected_text)} characters.")
-                        return selected_text
-        
-        return selected_text if selected_text else text[:int(MAX_CONTEXT_TOKENS * 4)]  # Fallback
-    
-    def process_with_openai(self, paper_text: str, title: str) -> Dict[str, str]:
+            for content in sections_by_header.get(priority, []):
+                # Each section is encoded once; the running total stands in for the joined text
+                content_tokens = _count_tokens(content)
+                if selected_tokens + content_tokens < token_budget:
+                    selected_parts.append("\n\n" + content)
+                    selected_tokens += content_tokens
+                else:
+                    # If adding this section would exceed limit, add partial content
+                    remaining_tokens = token_budget - selected_tokens
+                    if remaining_tokens > 250:  # Only add if meaningful amount remains
+                        selected_parts.append("\n\n" + _truncate_to_tokens(content, remaining_tokens) + "\n[SECTION TRUNCATED]")
+                    selected_text = "".join(selected_parts)
+                    self.logger.info(f"Reached token limit. Using {len(selected_text)} characters.")
+                    return selected_text
+        
+        selected_text = "".join(selected_parts)
+        return selected_text if selected_text else _truncate_to_tokens(text, MAX_CONTEXT_TOKENS)  # Fallback
+    
+    def _completion_params(self, user_content: str, output_instructions: str = "",
+                           max_tokens: int = OPENAI_MAX_TOKENS) -> Dict:
+        """Build chat completion parameters for a user message, handling model differences."""
+        # The prompt template goes in the system message so every request starts with the same
+        # prefix, which OpenAI's prompt caching bills at a discount after the first request
+        system_content = (
+            "You are an expert researcher specializing in educational technology and learning sciences. "
+            "Your task is to carefully analyze research papers and extract specific coding information "
+            f"for a systematic literature review.\n\n{self.prompt_template}"
+        )
+        if output_instructions:
+            system_content += f"\n\n{output_instructions}"
+        
+        # Prepare completion parameters - handle different models
+        completion_params = {
+            "model": OPENAI_MODEL,
+            "messages": [
+                {
+                    "role": "system", 
+                    "content": system_content
+                },
+                {
+                    "role": "user",
+                    "content": user_content
+                }
+            ]
+        }
+        
+        # Use appropriate token parameter based on model
+        if "gpt-5" in OPENAI_MODEL or "gpt-4o" in OPENAI_MODEL:
+            completion_params["max_completion_tokens"] = max_tokens
+        else:
+            completion_params["max_tokens"] = max_tokens
+        
+        # Only set temperature if model supports it (gpt-5-mini only supports default temperature)
+        if "gpt-5-mini" not in OPENAI_MODEL:
+            completion_params["temperature"] = OPENAI_TEMPERATURE
+        
+        return completion_params
+    
+    def _build_completion_params(self, paper_text: str) -> Dict:
+        """Build the chat completion request body for a single paper."""
+        # Use smart text processing for large documents
+        processed_text = self._smart_text_processing(paper_text)
+        
+        # Prepare the prompt
+        paper_prompt = f"RESEARCH PAPER:\n{processed_text}"
+        
+        if not OPENAI_STRUCTURED_OUTPUT:
+            # JSON mode still pins the answer to a single object, without needing schema support
+            completion_params = self._completion_params(
+                paper_prompt,
+                "Instead of the markdown format above, return ONLY a JSON object of the form "
+                '{"include": "Y or N", "exclusion_reason": "...", "fields": {"1.1": {"value": "...", '
+                '"source": "..."}, ...}} with one entry in "fields" for each question, keyed by its '
+                f"code ({FIELD_CODE_GUIDE}), giving the answer as \"value\" and the supporting "
+                'evidence as "source". Use "Not specified" when the paper does not provide the information.'
+            )
+            completion_params["response_format"] = {"type": "json_object"}
+            return completion_params
+        
+        # Structured outputs: the model must return one JSON object matching the CSV schema
+        completion_params = self._completion_params(
+            paper_prompt,
+            "Return your answers as a JSON object instead of the markdown format above: put each "
+            f"answer under the column key of its question ({COLUMN_KEY_GUIDE}) and the evidence "
+            "under the corresponding ' - Source' key."
+        )
+        completion_params["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {"name": "literature_coding", "schema": CODING_RESULT_SCHEMA, "strict": True}
+        }
+        return completion_params
+    
+    def _build_group_completion_params(self, papers: List[Tuple[str, str]]) -> Dict:
+        """Build one chat completion request body that codes several (title, text) papers at once."""
+        answer_keys = ", ".join(f'"{col}"' for col in CSV_COLUMNS if col != 'Title')
+        # No per-group details here, so the system message stays identical across groups
+        instructions = (
+            "The research papers in the user message are each marked with a '---PAPER i: title---' header. "
+            "Answer the questions above separately for EACH paper. Instead of the markdown format above, "
+            'return ONLY a JSON object of the form {"results": [{"paper_index": i, ...}, ...]} with one '
+            f"entry per paper, where each entry has the keys {answer_keys}, answering each question under "
+            f"its column key ({COLUMN_KEY_GUIDE}). Use \"Not specified\" when the paper does not provide "
+            "the information."
+        )
+        paper_blocks = "\n\n".join(
+            f"---PAPER {i}: {title}---\n{text}" for i, (title, text) in enumerate(papers, 1)
+        )
+        
+        completion_params = self._completion_params(
+            f"RESEARCH PAPERS:\n{paper_blocks}", instructions,
+            min(OPENAI_MAX_TOKENS * len(papers), OPENAI_MAX_OUTPUT_TOKENS)
+        )
+        if OPENAI_STRUCTURED_OUTPUT:
+            completion_params["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "literature_coding_group", "schema": GROUP_CODING_RESULT_SCHEMA, "strict": True}
+            }
+        else:
+            completion_params["response_format"] = {"type": "json_object"}
+        return completion_params
+    
+    def _log_response(self, response_text: Optional[str]):
+        """Log the raw model response for debugging."""
+        self.logger.info(f"Received response length: {len(response_text) if response_text else 0}")
+        if response_text and len(response_text) > 0:
+            self.logger.info(f"Response preview: {response_text[:300]}...")
+        else:
+            self.logger.warning("Empty response received from OpenAI")
+    
+    def _rate_limiters(self) -> Tuple[AsyncLimiter, AsyncLimiter]:
+        """Return the (token, request) limiters for the running event loop, creating them on first use.
+        
+        The buckets are keyed to the account's TPM and RPM limits so concurrent requests don't
+        trigger 429s. Each asyncio.run gets new ones, since aiolimiter limiters cannot be shared across loops.
+        """
+        loop = asyncio.get_running_loop()
+        if self._limiters is None or self._limiters[0] is not loop:
+            self._limiters = (loop, AsyncLimiter(OPENAI_TOKENS_PER_MINUTE, 60), AsyncLimiter(OPENAI_REQUESTS_PER_MINUTE, 60))
+        return self._limiters[1], self._limiters[2]
+    
+    @retry(
+        retry=retry_if_exception(_is_retryable_error),
+        wait=wait_random_exponential(min=1, max=60),
+        stop=stop_after_attempt(OPENAI_MAX_RETRIES),
+        reraise=True
+    )
+    async def _create_completion(self, completion_params: Dict):
+        """Send one chat completion request, throttled by the rate limits and retried on transient errors."""
+        # Rough estimation: 1 token ≈ 4 characters, plus the completion budget (larger for paper groups)
+        max_tokens = completion_params.get("max_completion_tokens", completion_params.get("max_tokens", OPENAI_MAX_TOKENS))
+        estimated_tokens = sum(len(m["content"]) for m in completion_params["messages"]) // 4 + max_tokens
+        rate_limiter, request_limiter = self._rate_limiters()
+        await request_limiter.acquire()
+        await rate_limiter.acquire(min(estimated_tokens, OPENAI_TOKENS_PER_MINUTE))
+        response = await self.client.chat.completions.create(**completion_params)
+        
+        # Cached tokens show whether the shared prompt prefix is hitting OpenAI's prompt cache
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            cached_tokens = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", 0)
+            self.logger.info(f"Prompt tokens: {usage.prompt_tokens} ({cached_tokens} cached)")
+        return response
+    
+    def _response_cache_path(self, completion_params: Dict) -> Path:
+        """Cache file for a chat completion response, keyed by the SHA-256 of the request body.
+        
+        The body holds the model, prompt, paper text and output format, so a change to any
+        of them (or to the PDF) misses the cache.
+        """
+        body = json.dumps(completion_params, sort_keys=True)
+        return Path(RESPONSE_CACHE_FOLDER) / f"{hashlib.sha256(body.encode('utf-8')).hexdigest()}.txt"
+    
+    def _write_response_cache(self, cache_path: Path, response_text: Optional[str]):
+        """Store a response for later runs; empty responses are not cached so they are retried."""
+        if not response_text:
+            return
+        try:
+            _write_cache_file(cache_path, response_text)
+        except OSError as e:
+            self.logger.warning(f"Could not write response cache {cache_path.name}: {e}")
+    
+    async def _cached_completion_text(self, completion_params: Dict, use_cache: bool = True) -> Optional[str]:
+        """Return the response text for a request, reusing the response of an identical earlier request."""
+        cache_path = self._response_cache_path(completion_params) if use_cache else None
+        if cache_path is not None and cache_path.exists():
+            self.logger.info("Using cached OpenAI response")
+            return cache_path.read_text(encoding='utf-8')
+        
+        response = await self._create_completion(completion_params)
+        choice = response.choices[0]
+        response_text = choice.message.content
+        if choice.finish_reason != "stop":
+            # Cut off at the token limit or filtered: not cached, so the next run asks again
+            self.logger.warning(f"OpenAI response ended with finish_reason '{choice.finish_reason}'")
+        elif cache_path is not None:
+            self._write_response_cache(cache_path, response_text)
+        return response_text
+    
+    async def process_with_openai(self, paper_text: str, title: str, use_cache: bool = True) -> Dict[str, str]:
         """Process paper text with OpenAI to extract coding information."""
         try:
-            # Use smart text processing for large documents
-            processed_text = self._smart_text_processing(paper_text)
-            
-            # Prepare the prompt
-            full_prompt = f"{self.prompt_template}\\n\\nRESEARCH PAPER:\\n{processed_text}"
-            
-            # Prepare completion parameters - handle different models
-            completion_params = {
-                "model": OPENAI_MODEL,
-                "messages": [
-                    {
-                        "role": "system", 
-                        "content": "You are an expert researcher specializing in educational technology and learning sciences. Your task is to carefully analyze research papers and extract specific coding information for a systematic literature review."
-                    },
-                    {
-                        "role": "user",
-                        "content": full_prompt
-                    }
-                ]
-            }
-            
-            # Use appropriate token parameter based on model
-            if "gpt-5" in OPENAI_MODEL or "gpt-4o" in OPENAI_MODEL:
-                completion_params["max_completion_tokens"] = OPENAI_MAX_TOKENS
-            else:
-                completion_params["max_tokens"] = OPENAI_MAX_TOKENS
+            completion_params = self._build_completion_params(paper_text)
             
-            # Only set temperature if model supports it (gpt-5-mini only supports default temperature)
-            if "gpt-5-mini" not in OPENAI_MODEL:
-                completion_params["temperature"] = OPENAI_TEMPERATURE
-            
-            response = self.client.chat.completions.create(**completion_params)
-            
-            response_text = response.choices[0].message.content
+            response_text = await self._cached_completion_text(completion_params, use_cache)
             
             # Log the response for debugging
-            self.logger.info(f"Received response length: {len(response_text) if response_text else 0}")
-            if response_text and len(response_text) > 0:
-                self.logger.info(f"Response preview: {response_text[:300]}...")
-            else:
-                self.logger.warning("Empty response received from OpenAI")
+            self._log_response(response_text)
             
             # Parse the response into structured data
             coded_data = self._parse_openai_response(response_text, title)
@@ -493,13 +934,190 @@ class LiteratureReviewExtractor:
             return coded_data
             
         except Exception as e:
+            _raise_if_auth_error(e)
             self.logger.error(f"Error processing with OpenAI: {e}")
             return self._create_empty_row(title)
     
+    async def submit_batch(self, requests: Dict[str, Dict]) -> Dict[str, Optional[str]]:
+        """Submit all papers as one OpenAI Batch API job and wait for the results.
+        
+        Args:
+            requests: Mapping of custom_id (the PDF filename) to chat completion request body.
+        
+        Returns:
+            Mapping of custom_id to the raw response text, or None for requests that failed.
+        """
+        # Build the JSONL input file, one chat completion request per paper
+        lines = []
+        for custom_id, completion_params in requests.items():
+            lines.append(json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": completion_params
+            }))
+        batch_input = ("\n".join(lines) + "\n").encode('utf-8')
+        
+        input_file = await self.client.files.create(
+            file=("literature_review_batch.jsonl", batch_input),
+            purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=BATCH_COMPLETION_WINDOW
+        )
+        self.logger.info(f"Submitted batch {batch.id} with {len(lines)} requests")
+        
+        # Poll for completion with exponential backoff
+        delay = BATCH_POLL_INITIAL_DELAY
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, BATCH_POLL_MAX_DELAY)
+            batch = await self.client.batches.retrieve(batch.id)
+            counts = batch.request_counts
+            self.logger.info(
+                f"Batch {batch.id} status: {batch.status} "
+                f"({counts.completed if counts else 0}/{counts.total if counts else len(lines)} completed)"
+            )
+        
+        results: Dict[str, Optional[str]] = {custom_id: None for custom_id in requests}
+        
+        if not batch.output_file_id:
+            self.logger.error(f"Batch {batch.id} finished with status '{batch.status}' and no output file")
+            return results
+        
+        # Each output line carries the custom_id of its request plus the chat completion body
+        output = (await self.client.files.content(batch.output_file_id)).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            # A malformed line only fails its own paper, not the rest of the batch
+            try:
+                record = json.loads(line)
+                custom_id = record.get("custom_id")
+                response = record.get("response") or {}
+                if record.get("error") or response.get("status_code") != 200:
+                    self.logger.error(f"Batch request failed for {custom_id}: {record.get('error') or response.get('body')}")
+                    continue
+                choice = response["body"]["choices"][0]
+                finish_reason = choice.get("finish_reason")
+                content = choice["message"]["content"]
+            except (AttributeError, IndexError, KeyError, TypeError, ValueError) as e:
+                self.logger.error(f"Could not read batch output line: {e}")
+                continue
+            if finish_reason != "stop":
+                # Truncated answers would be cached and parsed as a mis-coded row, so the paper is failed instead
+                self.logger.error(f"Batch response for {custom_id} ended with finish_reason '{finish_reason}'")
+                continue
+            if custom_id in results:
+                results[custom_id] = content
+        
+        if batch.error_file_id:
+            self.logger.warning(f"Batch {batch.id} reported errors, see file {batch.error_file_id}")
+        
+        return results
+    
+    async def process_batch(self, papers: List[Tuple[str, str]], use_cache: bool = True) -> List[Dict[str, str]]:
+        """Code several short (title, text) papers with a single chat completion request.
+        
+        The model returns a JSON object with one result per paper, so the fixed prompt is
+        only sent once for the whole group. Papers missing from the answer (for example when
+        it was cut off at the token limit), or all of them when the group request fails,
+        are coded with their own request. Those requests are sent one at a time, as the
+        caller holds a single concurrency slot for the whole group.
+        """
+        try:
+            response_text = await self._cached_completion_text(self._build_group_completion_params(papers), use_cache)
+        except Exception as e:
+            _raise_if_auth_error(e)
+            self.logger.error(f"Error processing paper group with OpenAI, coding its papers one by one: {e}")
+            return [await self.process_with_openai(text, title, use_cache) for title, text in papers]
+        
+        self._log_response(response_text)
+        
+        entries = {}
+        try:
+            for entry in json.loads(response_text).get("results", []):
+                try:
+                    entries[int(entry.get("paper_index"))] = entry
+                except (AttributeError, TypeError, ValueError):
+                    continue
+        except (AttributeError, TypeError, ValueError) as e:
+            self.logger.warning(f"Could not parse grouped response: {e}")
+        
+        results: List[Optional[Dict[str, str]]] = []
+        missing = []
+        for i, (title, _) in enumerate(papers, 1):
+            if i in entries:
+                results.append(self._coded_data_from_json(entries[i], title))
+                self.logger.info(f"Successfully processed paper: {title}")
+            else:
+                self.logger.warning(f"No result returned for paper {i} ({title}) in grouped request, coding it on its own")
+                results.append(None)
+                missing.append(i - 1)
+        
+        for k in missing:
+            results[k] = await self.process_with_openai(papers[k][1], papers[k][0], use_cache)
+        
+        return results
+    
+    def _pack_papers(self, papers: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+        """Group (title, text) papers so each group fits the context budget and paper limit.
+        
+        Papers are packed in title order rather than arrival order, so unchanged papers form
+        the same groups on every run and their requests hit the response cache.
+        """
+        # Keep 30% headroom for prompt and answers
+        token_budget = MAX_CONTEXT_TOKENS * 0.7
+        # Each paper gets OPENAI_MAX_TOKENS of output, which must fit in the model's output limit
+        max_group_size = max(1, min(MAX_PAPERS_PER_REQUEST, OPENAI_MAX_OUTPUT_TOKENS // OPENAI_MAX_TOKENS))
+        groups = []
+        current_group = []
+        current_tokens = 0
+        
+        for title, text in sorted(papers):
+            paper_tokens = _count_tokens(text)
+            if paper_tokens > token_budget:
+                # Too long to share a request; it goes through smart text processing on its own
+                groups.append([(title, text)])
+                continue
+            
+            if current_group and (current_tokens + paper_tokens > token_budget
+                                  or len(current_group) >= max_group_size):
+                groups.append(current_group)
+                current_group = []
+                current_tokens = 0
+            
+            current_group.append((title, text))
+            current_tokens += paper_tokens
+        
+        if current_group:
+            groups.append(current_group)
+        
+        return groups
+    
+    def _coded_data_from_json(self, entry: Dict, title: str) -> Dict[str, str]:
+        """Build a CSV row from a JSON result object keyed by CSV column names or by question code."""
+        if isinstance(entry.get("fields"), dict):
+            entry = _flatten_json_fields(entry)
+        
+        coded_data = DEFAULT_ROW.copy()
+        coded_data['Title'] = title
+        
+        for col in CSV_COLUMNS:
+            if col == 'Title':
+                continue
+            value = entry.get(col)
+            if value is not None and str(value).strip():
+                coded_data[col] = str(value).strip()
+        
+        return coded_data
+    
     def _parse_openai_response(self, response_text: str, title: str) -> Dict[str, str]:
         """Parse OpenAI response into structured coding data with source evidence."""
         # Initialize with default values
-        coded_data = {col: "Not specified" for col in CSV_COLUMNS}
+        coded_data = DEFAULT_ROW.copy()
         coded_data['Title'] = title
         
         # If response is empty or too short, return defaults
@@ -509,154 +1127,124 @@ class LiteratureReviewExtractor:
         
         self.logger.info(f"Processing response of length: {len(response_text)}")
         
+        # Structured output and JSON mode responses are a single JSON object
+        if response_text.lstrip().startswith("{"):
+            try:
+                return self._coded_data_from_json(json.loads(response_text), title)
+            except json.JSONDecodeError as e:
+                # Usually a reply cut off at the token limit; the text parser would only find
+                # "Not specified" everywhere, so the row is marked failed and redone on --resume
+                self.logger.error(f"Could not parse JSON response: {e}")
+                return self._create_empty_row(title)
+        
         try:
             # Split response into lines for processing
-            lines = [line.strip() for line in response_text.split('\n') if line.strip()]
+            lines = [stripped for line in response_text.split('\n') if (stripped := line.strip())]
             
-            # First, look for inclusion/exclusion decision and reason
-            for line in lines:
+            # One pass over the lines: inclusion decision and reason, then numbered answers
+            for i, line in enumerate(lines):
                 if line.startswith("**Include in Review**:"):
                     include_decision = line.replace("**Include in Review**:", "").strip()
                     coded_data['Include in Review (Y/N)'] = include_decision
                     self.logger.info(f"Extracted inclusion decision: {include_decision}")
-                elif line.startswith("**Reason if excluded**:"):
+                    continue
+                if line.startswith("**Reason if excluded**:"):
                     exclusion_reason = line.replace("**Reason if excluded**:", "").strip()
                     coded_data['Exclusion Reason'] = exclusion_reason
                     self.logger.info(f"Extracted exclusion reason: {exclusion_reason}")
-            
-            # Base column names (without " - Source" suffix)
-            base_columns = {
-                '1': '1.1 Primary Stakeholders',
-                '2': '1.2 Context',
-                '3': '1.3 Tech/AI type', 
-                '4': '1.4 Tool/Platform',
-                '5': '1.5 Education level',
-                '6': '2.1 Feedback term',
-                '7': '2.2 Description of context',
-                '8': '2.3 Our evaluation',
-                '9': '3.1 Agency type',
-                '10': '3.2 Feedback timing control',
-                '11': '4.1 Metrics for evaluation',
-                '12': '4.2 Measurement of agency'
-            }
-            
-            i = 0
-            while i < len(lines):
-                line = lines[i]
-                
-                # Method 1: Look for format "**X. [Question Title]**: content"
-                for num_str, base_column in base_columns.items():
-                    if line.startswith(f"**{num_str}."):
-                        # Extract everything after the first colon
-                        if ":" in line:
-                            answer = line.split(":", 1)[1].strip()
-                            # Remove any additional ** formatting
-                            answer = answer.replace("**", "").strip()
-                            
-                            # Filter out questions (shouldn't start with question words)
-                            question_starters = ["what ", "how ", "who ", "when ", "where ", "why ", "does ", "do ", "is ", "are ", "can ", "will ", "should "]
-                            # Also check for common question patterns - be more specific
-                            is_question = (any(answer.lower().startswith(q) for q in question_starters) or 
-                                         answer.endswith('?') or
-                                         ('question' in answer.lower() and len(answer) < 50) or  # Only short text with "question" 
-                                         (answer.lower().startswith('what ') or answer.lower().startswith('who ') or 
-                                          answer.lower().startswith('how ') or answer.lower().startswith('when ') or
-                                          answer.lower().startswith('where ') or answer.lower().startswith('why ')))
-                            if not is_question and len(answer) > 3:
-                                coded_data[base_column] = answer
-                                self.logger.info(f"Method 1 - Extracted {base_column}: {answer[:50]}...")
-                                
-                                # Look for source in next few lines
-                                source_column = base_column + " - Source"
-                                j = i + 1
-                                while j < len(lines) and j < i + 5:
-                                    next_line = lines[j]
-                                    if next_line.startswith("**Source**:"):
-                                        source = next_line.replace("**Source**:", "").strip()
-                                        coded_data[source_column] = source
-                                        self.logger.info(f"Method 1 - Extracted {source_column}: {source[:50]}...")
-                                        break
-                                    elif any(next_line.startswith(f"**{n}.") for n in base_columns.keys()):
-                                        break
-                                    j += 1
-                        break
-                
-                # Method 2: Look for format "X. **Field**: content" 
-                for num_str, base_column in base_columns.items():
-                    if line.startswith(f"{num_str}.") and "**:" in line:
-                        answer_part = line.split("**:", 1)
-                        if len(answer_part) > 1:
-                            answer = answer_part[1].strip()
-                            coded_data[base_column] = answer
-                            self.logger.info(f"Extracted {base_column}: {answer[:50]}...")
-                        break
+                    continue
                 
-                # Method 3: Look for simple numbered format "X. content"
-                for num_str, base_column in base_columns.items():
-                    # Skip if already extracted
-                    if coded_data[base_column] != "Not specified":
-                        continue
-                        
-                    if line.startswith(f"{num_str}.") and ":" in line:
-                        answer = line.split(":", 1)[1].strip()
-                        # Clean up markdown formatting
-                        answer = answer.replace("**", "").replace("*", "").strip()
-                        
-                        # Enhanced question filtering
-                        question_starters = ["what ", "how ", "who ", "when ", "where ", "why ", "does ", "do ", "is ", "are ", "can ", "will ", "should "]
-                        if answer and not any(answer.lower().startswith(q) for q in question_starters) and len(answer) > 3:
-                            coded_data[base_column] = answer
-                            self.logger.info(f"Method 3 - Extracted {base_column}: {answer[:50]}...")
-                            
-                            # Look for source on next line for this method too
-                            source_column = base_column + " - Source"
-                            if i + 1 < len(lines):
-                                next_line = lines[i + 1]
-                                if "source" in next_line.lower() and ":" in next_line:
-                                    source = next_line.split(":", 1)[1].strip()
-                                    coded_data[source_column] = source
-                                    self.logger.info(f"Method 3 - Extracted {source_column}: {source[:50]}...")
-                        break
+                # Match the question number once per line and dispatch by dict lookup
+                base_column, bold_prefix = _question_column(line)
+                if base_column is None:
+                    continue
+                source_column = SOURCE_COLUMNS[base_column]
                 
-                # Method 4: Look for "**X. Question Text**" or "X. **Question Text**" followed by "**Answer**: content"
-                for num_str, base_column in base_columns.items():
-                    # Skip if already extracted
-                    if coded_data[base_column] != "Not specified":
-                        continue
+                # Method 1: Look for format "**X. [Question Title]**: content"
+                if bold_prefix and ":" in line:
+                    # Extract everything after the first colon
+                    answer = line.partition(":")[2].strip()
+                    # Remove any additional ** formatting
+                    answer = answer.replace("**", "").strip()
+                    
+                    # Filter out questions (shouldn't start with question words)
+                    answer_lower = answer.lower()
+                    # Also check for common question patterns - be more specific
+                    is_question = (QUESTION_STARTER_RE.match(answer_lower) is not None or
+                                 answer.endswith('?') or
+                                 ('question' in answer_lower and len(answer) < 50))  # Only short text with "question"
+                    if not is_question and len(answer) > 3:
+                        coded_data[base_column] = answer
+                        self.logger.debug("Method 1 - Extracted %s: %.50s...", base_column, answer)
                         
-                    # Check for both "**X." and "X." patterns  
-                    if (line.startswith(f"**{num_str}.") or line.startswith(f"{num_str}.")) and "**" in line:
-                        # Look for **Answer**: in the next few lines
+                        # Look for source in next few lines
                         j = i + 1
                         while j < len(lines) and j < i + 5:
                             next_line = lines[j]
-                            if next_line.startswith("**Answer**:") or next_line.strip().startswith("**Answer**:"):
-                                answer = next_line.replace("**Answer**:", "").strip()
-                                if answer and len(answer) > 3:
-                                    coded_data[base_column] = answer
-                                    self.logger.info(f"Method 4 - Extracted {base_column}: {answer[:50]}...")
-                                    
-                                    # Look for source in the next line
-                                    source_column = base_column + " - Source"
-                                    if j + 1 < len(lines):
-                                        source_line = lines[j + 1]
-                                        if source_line.startswith("**Source**:") or source_line.strip().startswith("**Source**:"):
-                                            source = source_line.replace("**Source**:", "").strip()
-                                            coded_data[source_column] = source
-                                            self.logger.info(f"Method 4 - Extracted {source_column}: {source[:50]}...")
+                            if next_line.startswith("**Source**:"):
+                                source = next_line.replace("**Source**:", "").strip()
+                                coded_data[source_column] = source
+                                self.logger.debug("Method 1 - Extracted %s: %.50s...", source_column, source)
                                 break
-                            elif any(next_line.startswith(f"**{n}.") or next_line.startswith(f"{n}.") for n in base_columns.keys()):
-                                # Hit the next question, stop looking
+                            
+                            next_column, next_bold = _question_column(next_line)
+                            if next_column and next_bold:
                                 break
                             j += 1
-                        break
                 
-                i += 1            # Log extraction summary
-            # Total fields = CSV_COLUMNS - 3 (exclude Title, Include, and Exclusion Reason columns) 
-            total_fields = len(CSV_COLUMNS) - 3  
-            extracted_count = sum(1 for col, val in coded_data.items() 
-                                if col not in ["Title", "Include in Review (Y/N)", "Exclusion Reason"] and val != "Not specified")
-            self.logger.info(f"Successfully extracted {extracted_count} out of {total_fields} fields")
+                # Method 2: Look for format "X. **Field**: content" 
+                if not bold_prefix and "**:" in line:
+                    answer = line.partition("**:")[2].strip()
+                    coded_data[base_column] = answer
+                    self.logger.debug("Extracted %s: %.50s...", base_column, answer)
+                
+                # Method 3: Look for simple numbered format "X. content" (skip if already extracted)
+                if not bold_prefix and ":" in line and coded_data[base_column] == "Not specified":
+                    answer = line.partition(":")[2].strip()
+                    # Clean up markdown formatting
+                    answer = answer.replace("**", "").replace("*", "").strip()
+                    
+                    # Enhanced question filtering
+                    if answer and not QUESTION_STARTER_RE.match(answer.lower()) and len(answer) > 3:
+                        coded_data[base_column] = answer
+                        self.logger.debug("Method 3 - Extracted %s: %.50s...", base_column, answer)
+                        
+                        # Look for source on next line for this method too
+                        if i + 1 < len(lines):
+                            next_line = lines[i + 1]
+                            if "source" in next_line.lower() and ":" in next_line:
+                                source = next_line.partition(":")[2].strip()
+                                coded_data[source_column] = source
+                                self.logger.debug("Method 3 - Extracted %s: %.50s...", source_column, source)
+                
+                # Method 4: Look for "**X. Question Text**" or "X. **Question Text**" followed by "**Answer**: content"
+                if "**" in line and coded_data[base_column] == "Not specified":
+                    # Look for **Answer**: in the next few lines
+                    j = i + 1
+                    while j < len(lines) and j < i + 5:
+                        next_line = lines[j]
+                        if next_line.startswith("**Answer**:") or next_line.strip().startswith("**Answer**:"):
+                            answer = next_line.replace("**Answer**:", "").strip()
+                            if answer and len(answer) > 3:
+                                coded_data[base_column] = answer
+                                self.logger.debug("Method 4 - Extracted %s: %.50s...", base_column, answer)
+                                
+                                # Look for source in the next line
+                                if j + 1 < len(lines):
+                                    source_line = lines[j + 1]
+                                    if source_line.startswith("**Source**:") or source_line.strip().startswith("**Source**:"):
+                                        source = source_line.replace("**Source**:", "").strip()
+                                        coded_data[source_column] = source
+                                        self.logger.debug("Method 4 - Extracted %s: %.50s...", source_column, source)
+                            break
+                        elif _question_column(next_line)[0]:
+                            # Hit the next question, stop looking
+                            break
+                        j += 1
+            
+            # Log extraction summary
+            extracted_count = sum(coded_data[col] != "Not specified" for col in ANSWER_COLUMNS)
+            self.logger.info(f"Successfully extracted {extracted_count} out of {len(ANSWER_COLUMNS)} fields")
             
         except Exception as e:
             self.logger.warning(f"Error parsing response: {e}")
@@ -666,66 +1254,211 @@ class LiteratureReviewExtractor:
     
     def _create_empty_row(self, title: str) -> Dict[str, str]:
         """Create empty row with default values when processing fails."""
-        empty_row = {col: "Processing failed" for col in CSV_COLUMNS if col not in ['Title', 'Include in Review (Y/N)', 'Exclusion Reason']}
+        empty_row = FAILED_ROW.copy()
         empty_row['Title'] = title
-        empty_row['Include in Review (Y/N)'] = "N"  # Default to exclude if processing failed
-        empty_row['Exclusion Reason'] = "Processing failed"
         return empty_row
     
-    def process_all_pdfs(self) -> List[Dict[str, str]]:
+    async def _process_with_batch_api(self, pending_texts: Dict[str, str], pending_titles: Dict[str, str],
+                                      use_cache: bool = True) -> List[Dict[str, str]]:
+        """Code all pending papers through a single Batch API job, skipping papers with cached responses."""
+        requests = {custom_id: self._build_completion_params(text) for custom_id, text in pending_texts.items()}
+        cache_paths = {custom_id: self._response_cache_path(params) for custom_id, params in requests.items()}
+        
+        responses: Dict[str, Optional[str]] = {}
+        if use_cache:
+            for custom_id, cache_path in cache_paths.items():
+                if cache_path.exists():
+                    responses[custom_id] = cache_path.read_text(encoding='utf-8')
+            if responses:
+                self.logger.info(f"Using cached OpenAI responses for {len(responses)} papers")
+        
+        uncached = {custom_id: params for custom_id, params in requests.items() if custom_id not in responses}
+        if uncached:
+            try:
+                batch_responses = await self.submit_batch(uncached)
+            except Exception as e:
+                _raise_if_auth_error(e)
+                self.logger.error(f"Error submitting batch to OpenAI: {e}")
+                batch_responses = {}
+            responses.update(batch_responses)
+            if use_cache:
+                for custom_id, response_text in batch_responses.items():
+                    self._write_response_cache(cache_paths[custom_id], response_text)
+        
+        results = []
+        for custom_id, title in pending_titles.items():
+            response_text = responses.get(custom_id)
+            if response_text is None:
+                results.append(self._create_empty_row(title))
+                continue
+            
+            self._log_response(response_text)
+            results.append(self._parse_openai_response(response_text, title))
+            self.logger.info(f"Successfully processed paper: {title}")
+        
+        return results
+    
+    async def _bounded_process(self, semaphore: asyncio.Semaphore, papers: List[Tuple[str, str]],
+                               use_cache: bool = True) -> List[Dict[str, str]]:
+        """Process one or more (title, text) papers with OpenAI while holding a concurrency slot."""
+        async with semaphore:
+            if len(papers) == 1:
+                title, paper_text = papers[0]
+                return [await self.process_with_openai(paper_text, title, use_cache)]
+            return await self.process_batch(papers, use_cache)
+    
+    async def _extract_all(self, pdf_files: List[str], use_cache: bool = True):
+        """Extract text from all PDFs in worker processes, yielding (filename, text) as each finishes."""
+        loop = asyncio.get_running_loop()
+        # No more processes than PDFs, so small runs don't pay for idle worker start-up
+        with ProcessPoolExecutor(max_workers=max(1, min(EXTRACTION_WORKERS, len(pdf_files)))) as executor:
+            # Workers get resolved settings as arguments instead of relying on their own config import
+            futures = [loop.run_in_executor(executor, _extract_worker, pdf_file, MAX_EXTRACTED_CHARS, use_cache)
+                       for pdf_file in pdf_files]
+            for next_done in tqdm(asyncio.as_completed(futures), total=len(futures), desc="Extracting PDFs"):
+                yield await next_done
+    
+    async def process_all_pdfs(self, use_cache: bool = True) -> List[Dict[str, str]]:
         """Process all PDF files in the PDF folder."""
+        results = []
+        async for rows in self.iter_results(use_cache):
+            results.extend(rows)
+        return results
+    
+    async def iter_results(self, use_cache: bool = True, skip_titles: frozenset = frozenset(),
+                           processing_mode: str = PROCESSING_MODE):
+        """Process the PDF files in the PDF folder, yielding lists of CSV rows as papers finish.
+        
+        Args:
+            use_cache: Reuse extracted text and OpenAI responses cached in TEXT_CACHE_FOLDER.
+            skip_titles: Titles (or PDF filenames) already coded, which are skipped before extraction.
+            processing_mode: 'async' for concurrent requests, 'batch' for one Batch API job.
+        """
         pdf_folder = Path(PDF_FOLDER)
         
         if not pdf_folder.exists():
             self.logger.error(f"PDF folder {PDF_FOLDER} does not exist")
-            return []
-        
-        # Find PDF files with both .pdf and .PDF extensions
-        pdf_files = list(pdf_folder.glob("*.pdf")) + list(pdf_folder.glob("*.PDF"))
+            return
         
-        # Remove duplicates (in case same file exists with different cases)
-        pdf_files = list(set(pdf_files))
+        pdf_files = find_pdf_files(pdf_folder)
         
         if not pdf_files:
             self.logger.warning(f"No PDF files found in {PDF_FOLDER}")
-            return []
+            return
+        
+        if skip_titles:
+            # Titles come from filenames only, so coded papers are skipped without extracting them
+            remaining = [pdf_file for pdf_file in pdf_files
+                         if Path(pdf_file).name not in skip_titles
+                         and self.get_paper_title("", Path(pdf_file).name) not in skip_titles]
+            self.logger.info(f"Skipping {len(pdf_files) - len(remaining)} PDF files already coded")
+            pdf_files = remaining
         
         self.logger.info(f"Found {len(pdf_files)} PDF files to process")
         
-        results = []
+        # Papers awaiting the Batch API, keyed by PDF filename (the batch custom_id)
+        pending_texts: Dict[str, str] = {}
+        pending_titles: Dict[str, str] = {}
+        # In async mode each paper is sent to OpenAI as soon as its text is extracted,
+        # unless short papers are packed into shared requests after extraction
+        semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENT_REQUESTS)
+        api_tasks: List[asyncio.Task] = []
+        papers_to_pack: List[Tuple[str, str]] = []
         
-        for pdf_file in tqdm(pdf_files, desc="Processing PDFs"):
-            self.logger.info(f"Processing: {pdf_file.name}")
+        extraction = self._extract_all(pdf_files, use_cache)
+        next_paper = asyncio.ensure_future(extraction.__anext__())
+        while True:
+            # Yield papers coded while the next PDF is still being extracted, so a long
+            # extraction does not hold back (or lose on a crash) rows that are already done
+            while api_tasks and not next_paper.done():
+                await asyncio.wait([next_paper, *api_tasks], return_when=asyncio.FIRST_COMPLETED)
+                for task in [task for task in api_tasks if task.done()]:
+                    api_tasks.remove(task)
+                    yield task.result()
             
-            # Extract text
-            text = self.extract_text_from_pdf(str(pdf_file))
+            try:
+                pdf_name, text = await next_paper
+            except StopAsyncIteration:
+                break
+            next_paper = asyncio.ensure_future(extraction.__anext__())
             
             if not text:
-                self.logger.warning(f"No text extracted from {pdf_file.name}")
+                self.logger.warning(f"No text extracted from {pdf_name}")
                 # Create a row with failure information but still try to get a meaningful title
-                empty_row = self._create_empty_row(pdf_file.name)
+                empty_row = self._create_empty_row(pdf_name)
                 empty_row['Exclusion Reason'] = "Text extraction failed - file may be corrupted, encrypted, or image-based"
-                results.append(empty_row)
+                yield [empty_row]
                 continue
             
             # Check if extracted text is meaningful (not just fallback message)
-            if "text extraction failed with all available methods including ocr" in text.lower():
-                self.logger.warning(f"Fallback text used for {pdf_file.name} - manual review needed")
+            if _is_fallback_text(text):
+                self.logger.warning(f"Fallback text used for {pdf_name} - manual review needed")
                 # Use the extracted text anyway as it contains the title
-                title = self.get_paper_title(text, pdf_file.name)
+                title = self.get_paper_title(text, pdf_name)
                 empty_row = self._create_empty_row(title)
                 empty_row['Exclusion Reason'] = "PDF processing issues - requires manual review"
-                results.append(empty_row)
+                yield [empty_row]
                 continue
             
             # Get title
-            title = self.get_paper_title(text, pdf_file.name)
+            title = self.get_paper_title(text, pdf_name)
+            
+            if _is_low_quality_text(text):
+                self.logger.warning(f"Too little readable text extracted from {pdf_name} - manual review needed")
+                empty_row = self._create_empty_row(title)
+                empty_row['Exclusion Reason'] = "Too little readable text extracted - PDF may be scanned or image-based"
+                yield [empty_row]
+                continue
             
-            # Process with OpenAI
-            coded_data = self.process_with_openai(text, title)
-            results.append(coded_data)
+            if processing_mode == 'batch':
+                pending_titles[pdf_name] = title
+                pending_texts[pdf_name] = text
+            elif MAX_PAPERS_PER_REQUEST > 1:
+                papers_to_pack.append((title, text))
+            else:
+                api_tasks.append(asyncio.create_task(self._bounded_process(semaphore, [(title, text)], use_cache)))
         
-        return results
+        for group in self._pack_papers(papers_to_pack):
+            api_tasks.append(asyncio.create_task(self._bounded_process(semaphore, group, use_cache)))
+        
+        # Send papers to OpenAI, either as one Batch API job or by waiting on the concurrent requests
+        if pending_texts:
+            yield await self._process_with_batch_api(pending_texts, pending_titles, use_cache)
+        
+        if api_tasks:
+            for next_done in tqdm(asyncio.as_completed(api_tasks), total=len(api_tasks), desc="Processing PDFs"):
+                yield await next_done
+    
+    async def _write_all_results(self, writer: csv.DictWriter, output_file, use_cache: bool = True,
+                                 skip_titles: frozenset = frozenset(),
+                                 processing_mode: str = PROCESSING_MODE) -> int:
+        """Write rows as papers finish, then close the client's connection pool in the same event loop.
+        
+        Each run gets a new client, so closing it does not break a later run on this extractor.
+        """
+        written = 0
+        self.client = self._initialize_openai_client()
+        async with self.client:
+            async for rows in self.iter_results(use_cache, skip_titles, processing_mode):
+                writer.writerows(rows)
+                # Flush each paper so an interrupted run keeps everything coded so far
+                output_file.flush()
+                written += len(rows)
+        return written
+    
+    def _latest_results_file(self) -> Optional[Path]:
+        """Return the most recently written results CSV in the output folder, if any."""
+        results_files = list(Path(OUTPUT_FOLDER).glob("literature_coding_results_*.csv"))
+        return max(results_files, key=lambda path: path.stat().st_mtime) if results_files else None
+    
+    def _load_coded_rows(self, csv_path: Path) -> List[Dict[str, str]]:
+        """Read the rows of a previous run that do not need to be redone.
+        
+        Rows whose OpenAI request failed are left out, so those papers are coded again.
+        """
+        with open(csv_path, 'r', newline='', encoding='utf-8-sig') as f:
+            rows = list(csv.DictReader(f))
+        return [row for row in rows if row.get('Exclusion Reason') != "Processing failed"]
     
     def save_to_csv(self, results: List[Dict[str, str]], filename: Optional[str] = None) -> str:
         """Save results to CSV file."""
@@ -733,30 +1466,11 @@ class LiteratureReviewExtractor:
             self.logger.warning("No results to save")
             return ""
         
-        # Create output directory if it doesn't exist
-        output_dir = Path(OUTPUT_FOLDER)
-        output_dir.mkdir(exist_ok=True)
-        
-        # Generate filename if not provided
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"literature_coding_results_{timestamp}.csv"
-        
-        output_path = output_dir / filename
+        output_path = _results_path(filename)
         
         try:
-            # Save to CSV with better encoding handling
-            df = pd.DataFrame(results, columns=CSV_COLUMNS)
-            
-            # Ensure all text data is properly encoded
-            for col in df.columns:
-                if df[col].dtype == 'object':  # Text columns
-                    df[col] = df[col].astype(str).apply(
-                        lambda x: x.encode('utf-8', errors='ignore').decode('utf-8') if isinstance(x, str) else x
-                    )
-            
-            # Save with UTF-8 encoding and BOM for Excel compatibility
-            df.to_csv(output_path, index=False, encoding='utf-8-sig')
+            with _open_results_writer(output_path) as (_, writer):
+                writer.writerows(results)
             
             self.logger.info(f"Results saved to {output_path}")
             self.logger.info(f"Processed {len(results)} papers")
@@ -767,34 +1481,84 @@ class LiteratureReviewExtractor:
             self.logger.error(f"Error saving results: {e}")
             raise
     
-    def run(self, output_filename: Optional[str] = None) -> str:
-        """Main method to run the complete extraction process."""
+    def run(self, output_filename: Optional[str] = None, use_cache: bool = True, resume: bool = False,
+            processing_mode: str = PROCESSING_MODE) -> str:
+        """Main method to run the complete extraction process.
+        
+        Rows are written to the CSV as each paper finishes. With resume, papers already coded in
+        output_filename (or the latest results file) are skipped and new rows are added to that file.
+        """
         self.logger.info("Starting literature review extraction process")
         
         try:
-            # Process all PDFs
-            results = self.process_all_pdfs()
+            output_path = None
+            if resume and not output_filename:
+                output_path = self._latest_results_file()
+            if output_path is None:
+                output_path = _results_path(output_filename)
+            
+            coded_rows = []
+            if resume and output_path.exists():
+                coded_rows = self._load_coded_rows(output_path)
+                self.logger.info(f"Resuming {output_path}: {len(coded_rows)} papers already coded")
+            
+            skip_titles = frozenset(row['Title'] for row in coded_rows)
+            
+            # The file is rewritten with the rows being kept, which drops failed rows that are about to be redone
+            with _open_results_writer(output_path) as (f, writer):
+                writer.writerows(coded_rows)
+                written = asyncio.run(self._write_all_results(writer, f, use_cache, skip_titles, processing_mode))
             
-            if not results:
+            if not written and not coded_rows:
                 self.logger.error("No results to save")
+                output_path.unlink()
                 return ""
             
-            # Save to CSV
-            output_path = self.save_to_csv(results, output_filename)
-            
+            self.logger.info(f"Results saved to {output_path}")
+            self.logger.info(f"Processed {written} papers")
             self.logger.info("Literature review extraction completed successfully")
-            return output_path
+            return str(output_path)
             
         except Exception as e:
             self.logger.error(f"Error in extraction process: {e}")
             raise
 
 
+def _extract_worker(pdf_path: str, max_chars: Optional[int] = None, use_cache: bool = True) -> Tuple[str, str]:
+    """Extract text from a single PDF in a worker process.
+    
+    Module-level so it can be pickled by ProcessPoolExecutor.
+    """
+    extractor = PDFTextExtractor()
+    filename = Path(pdf_path).name
+    extractor.logger.info(f"Processing: {filename}")
+    try:
+        return filename, extractor.extract_text_from_pdf(pdf_path, max_chars=max_chars, use_cache=use_cache)
+    except Exception as e:
+        extractor.logger.error(f"Unexpected error extracting {filename}: {e}")
+        return filename, ""
+
+
 def main():
     """Main function to run the literature review extractor."""
+    parser = argparse.ArgumentParser(description="Extract literature review coding data from PDFs with OpenAI.")
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f"Re-extract and re-code every PDF instead of reusing text and OpenAI "
+                             f"responses cached in {TEXT_CACHE_FOLDER}/")
+    parser.add_argument('--batch', action='store_true',
+                        help="Submit all papers as one OpenAI Batch API job (50%% cheaper, results within 24h) "
+                             "instead of concurrent requests; same as PROCESSING_MODE=batch")
+    parser.add_argument('--output', metavar='FILENAME',
+                        help=f"CSV filename in {OUTPUT_FOLDER}/ (default: a new timestamped file)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip papers already coded in the output CSV (default: the latest results file) "
+                             "and add the remaining ones to it")
+    args = parser.parse_args()
+    
     try:
         extractor = LiteratureReviewExtractor()
-        output_path = extractor.run()
+        output_path = extractor.run(args.output, use_cache=not args.no_cache, resume=args.resume,
+                                    processing_mode='batch' if args.batch else PROCESSING_MODE)
         
         if output_path:
             print(f"\n✅ Extraction completed successfully!")
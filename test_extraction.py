@@ -6,8 +6,70 @@ without running the full OpenAI processing pipeline.
 """
 
 import logging
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from literature_review_extractor import LiteratureReviewExtractor
+from typing import Dict, Tuple
+from config import EXTRACTION_WORKERS, MAX_EXTRACTED_CHARS
+from literature_review_extractor import PDFTextExtractor, find_pdf_files
+
+
+def _probe_pdf(pdf_path: str) -> Tuple[Dict, str]:
+    """Extract text from one PDF and return its result along with the lines to report.
+    
+    Runs in a worker process; the report is returned rather than printed so the
+    caller can write each file's lines in one piece.
+    """
+    extractor = PDFTextExtractor()
+    pdf_file = Path(pdf_path)
+    lines = [f"📄 Testing: {pdf_file.name}"]
+    
+    try:
+        # Get file size
+        file_size = pdf_file.stat().st_size
+        size_mb = file_size / (1024 * 1024)
+        
+        # Extract text with the same limit as the main pipeline, so both share the text cache
+        text = extractor.extract_text_from_pdf(str(pdf_file), max_chars=MAX_EXTRACTED_CHARS)
+        
+        if text and len(text.strip()) > 0:
+            char_count = len(text)
+            word_count = len(text.split())
+            
+            lines.append(f"   ✅ SUCCESS - {char_count:,} chars, {word_count:,} words, {size_mb:.1f}MB")
+            
+            # Show first 100 characters as preview
+            preview = text[:100].replace('\n', ' ').strip()
+            lines.append(f"   📝 Preview: {preview}...")
+            
+            result = {
+                'file': pdf_file.name,
+                'status': 'SUCCESS',
+                'chars': char_count,
+                'words': word_count,
+                'size_mb': size_mb
+            }
+            
+        else:
+            lines.append(f"   ❌ FAILED - No text extracted ({size_mb:.1f}MB)")
+            result = {
+                'file': pdf_file.name,
+                'status': 'FAILED',
+                'chars': 0,
+                'words': 0,
+                'size_mb': size_mb
+            }
+            
+    except Exception as e:
+        lines.append(f"   ❌ ERROR - {str(e)}")
+        result = {
+            'file': pdf_file.name,
+            'status': 'ERROR',
+            'error': str(e)
+        }
+    
+    # Empty line between files
+    return result, "\n".join(lines) + "\n\n"
 
 
 def test_all_pdf_extraction():
@@ -19,20 +81,6 @@ def test_all_pdf_extraction():
         format='%(levelname)s - %(message)s'
     )
     
-    # Initialize extractor (without OpenAI connection needed)
-    try:
-        extractor = LiteratureReviewExtractor()
-    except Exception as e:
-        print(f"⚠️  Note: OpenAI initialization failed ({e}), but text extraction testing will continue")
-        # Create a minimal extractor instance for testing
-        extractor = type('MockExtractor', (), {})()
-        extractor.logger = logging.getLogger(__name__)
-        
-        # Import the extraction method directly
-        from literature_review_extractor import LiteratureReviewExtractor
-        temp_extractor = LiteratureReviewExtractor.__new__(LiteratureReviewExtractor)
-        extractor.extract_text_from_pdf = temp_extractor.extract_text_from_pdf.__get__(extractor)
-    
     pdf_folder = Path("pdfs")
     
     if not pdf_folder.exists():
@@ -40,8 +88,7 @@ def test_all_pdf_extraction():
         return False
     
     # Find all PDF files
-    pdf_files = list(pdf_folder.glob("*.pdf")) + list(pdf_folder.glob("*.PDF"))
-    pdf_files = list(set(pdf_files))  # Remove duplicates
+    pdf_files = find_pdf_files(pdf_folder)
     
     if not pdf_files:
         print(f"❌ No PDF files found in '{pdf_folder}'")
@@ -51,60 +98,25 @@ def test_all_pdf_extraction():
     print("=" * 80)
     
     successful = 0
-    failed = 0
-    results = []
-    
-    for pdf_file in sorted(pdf_files):
-        print(f"📄 Testing: {pdf_file.name}")
-        
-        try:
-            # Get file size
-            file_size = pdf_file.stat().st_size
-            size_mb = file_size / (1024 * 1024)
-            
-            # Extract text
-            text = extractor.extract_text_from_pdf(str(pdf_file))
-            
-            if text and len(text.strip()) > 0:
-                char_count = len(text)
-                word_count = len(text.split())
-                
-                print(f"   ✅ SUCCESS - {char_count:,} chars, {word_count:,} words, {size_mb:.1f}MB")
-                
-                # Show first 100 characters as preview
-                preview = text[:100].replace('\n', ' ').strip()
-                print(f"   📝 Preview: {preview}...")
-                
-                results.append({
-                    'file': pdf_file.name,
-                    'status': 'SUCCESS',
-                    'chars': char_count,
-                    'words': word_count,
-                    'size_mb': size_mb
-                })
+    total_chars = 0
+    # Only failures are kept, for the list in the summary
+    failed_results = []
+    
+    # PDF parsing is CPU-bound, so files are extracted in parallel worker processes
+    # and reported in the order they finish
+    with ProcessPoolExecutor(max_workers=max(1, min(EXTRACTION_WORKERS, len(pdf_files)))) as executor:
+        futures = [executor.submit(_probe_pdf, pdf_file) for pdf_file in sorted(pdf_files)]
+        for future in as_completed(futures):
+            result, report = future.result()
+            # One write per file, so the lines of different files never interleave
+            sys.stdout.write(report)
+            if result['status'] == 'SUCCESS':
                 successful += 1
-                
+                total_chars += result['chars']
             else:
-                print(f"   ❌ FAILED - No text extracted ({size_mb:.1f}MB)")
-                results.append({
-                    'file': pdf_file.name,
-                    'status': 'FAILED',
-                    'chars': 0,
-                    'words': 0,
-                    'size_mb': size_mb
-                })
-                failed += 1
-                
-        except Exception as e:
-            print(f"   ❌ ERROR - {str(e)}")
-            results.append({
-                'file': pdf_file.name,
-                'status': 'ERROR',
-                'error': str(e)
-            })
-            failed += 1
-            
-        print()  # Empty line between files
+                failed_results.append(result)
+    
+    failed = len(failed_results)
     
     # Summary
     print("=" * 80)
@@ -116,17 +128,14 @@ def test_all_pdf_extraction():
     
     if failed > 0:
         print(f"\n⚠️  FAILED FILES:")
-        for result in results:
-            if result['status'] != 'SUCCESS':
-                print(f"   - {result['file']} ({result['status']})")
+        for result in failed_results:
+            print(f"   - {result['file']} ({result['status']})")
     else:
         print(f"\n🎉 All PDF files can be successfully processed!")
     
     # Optional: Show statistics for successful extractions
     if successful > 0:
-        successful_results = [r for r in results if r['status'] == 'SUCCESS']
-        total_chars = sum(r['chars'] for r in successful_results)
-        avg_chars = total_chars / len(successful_results)
+        avg_chars = total_chars / successful
         
         print(f"\n📈 EXTRACTION STATISTICS:")
         print(f"   Average characters per file: {avg_chars:,.0f}")
@@ -154,4 +163,4 @@ def main():
 
 
 if __name__ == "__main__":
-    exit(main())
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file